@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 Kirky.X
+#
+# Licensed under the MIT License
+# See LICENSE file in the project root for full license information.
+
+"""
+端到端测试客户端
+
+封装 crawlrs API 的任务创建、状态查询、等待与取消等辅助函数（同步与异步两套），供端到端测试场景复用。
+"""
+
+import asyncio
+import httpx
+import time
+import orjson
+from typing import Any, Coroutine, Dict, Optional, Set, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # uvloop 不支持 Windows，回退到标准事件循环
+    uvloop = None
+
+T = TypeVar("T")
+
+# 基础配置
+BASE_URL = "http://localhost:8899"
+HEADERS = {
+    "Authorization": "Bearer test-api-key",
+    "Content-Type": "application/json"
+}
+
+# 长轮询时服务端挂起请求的最长秒数
+LONG_POLL_TIMEOUT = 30
+
+# 共享客户端：服务端协商出 HTTP/2 时并发请求复用同一连接，否则回退到 HTTP/1.1 keep-alive
+CLIENT_OPTIONS = {
+    "http2": True,
+    "base_url": BASE_URL,
+    "headers": HEADERS,
+    "timeout": 30,
+    "limits": httpx.Limits(max_connections=100, max_keepalive_connections=100)
+}
+CLIENT = httpx.Client(**CLIENT_OPTIONS)
+
+# 任务进入这些状态后不再变化
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "timeout"}
+
+def _parse_create(response: httpx.Response) -> Optional[str]:
+    """解析创建任务的响应，成功时返回任务ID"""
+    if response.status_code in [201, 202]:
+        return orjson.loads(response.content).get("id")
+    print(f"创建任务失败: {response.status_code} - {response.text}")
+    return None
+
+def _status_options(long_poll: bool, max_wait: float) -> Dict[str, Any]:
+    """状态查询请求的额外参数；长轮询时请求服务端挂起直到状态变化，整个请求不超过 max_wait 秒"""
+    if not long_poll:
+        return {}
+    hold = max(0, min(LONG_POLL_TIMEOUT, int(max_wait) - 5))
+    return {
+        "params": {"wait": "status_change", "timeout": hold},
+        "timeout": min(hold + 5, max_wait)
+    }
+
+def _parse_status(response: httpx.Response, long_poll: bool,
+                  log_errors: bool = True) -> Optional[Dict[str, Any]]:
+    """解析状态查询响应；长轮询返回 304（等待期间状态未变化）时返回空字典"""
+    if response.status_code == 200:
+        return orjson.loads(response.content)
+    if long_poll and response.status_code == 304:
+        return {}
+    if log_errors:
+        print(f"获取任务状态失败: {response.status_code}")
+    return None
+
+def _is_finished(status: Optional[Dict[str, Any]]) -> bool:
+    """查询失败或任务已进入终态时结束等待"""
+    return status is None or status.get("status", "").lower() in TERMINAL_STATUSES
+
+def _poll_delay(request_started: float, poll_interval: float, deadline: float) -> float:
+    """下一次查询前的等待秒数
+
+    服务端挂起过请求时立即发起下一次长轮询；服务端未挂起而立即返回时退回到定时轮询，
+    补足 poll_interval。等待不会越过 deadline。
+    """
+    return max(0.0, min(request_started + poll_interval, deadline) - time.monotonic())
+
+def create_task(endpoint: str, payload: Dict[str, Any]) -> Optional[str]:
+    """创建任务并返回任务ID"""
+    try:
+        return _parse_create(CLIENT.post(endpoint, content=orjson.dumps(payload)))
+    except Exception as e:
+        print(f"创建任务异常: {e}")
+        return None
+
+def get_task_status(task_id: str, endpoint: str = "/v1/scrape", long_poll: bool = False,
+                    max_wait: float = LONG_POLL_TIMEOUT + 5,
+                    log_errors: bool = True) -> Optional[Dict[str, Any]]:
+    """获取任务状态
+
+    long_poll 为 True 时请求服务端挂起连接直到状态变化（最长 LONG_POLL_TIMEOUT 秒，
+    且整个请求不超过 max_wait 秒）；服务端返回 304 表示等待期间状态未变化，此时返回空字典。
+    log_errors 为 False 时查询失败不输出日志，由调用方汇总报告。
+    """
+    try:
+        response = CLIENT.get(f"{endpoint}/{task_id}", **_status_options(long_poll, max_wait))
+        return _parse_status(response, long_poll, log_errors)
+    except Exception as e:
+        if log_errors:
+            print(f"获取任务状态异常: {e}")
+        return None
+
+def wait_for_task_completion(task_id: str, endpoint: str = "/v1/scrape", 
+                           timeout: int = 60, poll_interval: int = 2) -> Optional[Dict[str, Any]]:
+    """等待任务完成并返回最终结果"""
+    deadline = time.monotonic() + timeout
+    
+    while time.monotonic() < deadline:
+        request_started = time.monotonic()
+        status = get_task_status(task_id, endpoint, long_poll=True, max_wait=deadline - request_started)
+        if _is_finished(status):
+            return status
+        
+        time.sleep(_poll_delay(request_started, poll_interval, deadline))
+    
+    print(f"任务 {task_id} 超时未完成")
+    return None
+
+def wait_for_status(task_id: str, endpoint: str, target_statuses: Set[str],
+                    timeout: float = 10, poll_interval: float = 0.1) -> Optional[Dict[str, Any]]:
+    """轮询任务状态直到进入 target_statuses 之一或超时，返回最后一次获取到的状态
+
+    单次查询失败不输出日志，超时时统一报告一次。
+    """
+    deadline = time.monotonic() + timeout
+    status = None
+    
+    while time.monotonic() < deadline:
+        status = get_task_status(task_id, endpoint, log_errors=False) or status
+        if status and status.get("status", "").lower() in target_statuses:
+            return status
+        time.sleep(poll_interval)
+    
+    last_seen = status.get("status") if status else "未获取到状态"
+    print(f"任务 {task_id} 在 {timeout}s 内未进入状态 {sorted(target_statuses)}，最后状态: {last_seen}")
+    return status
+
+def cancel_task(task_id: str, endpoint: str = "/v1/scrape") -> bool:
+    """取消任务"""
+    try:
+        response = CLIENT.delete(f"{endpoint}/{task_id}")
+        return response.status_code == 204
+    except Exception as e:
+        print(f"取消任务异常: {e}")
+        return False
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """运行异步测试入口；可用时使用 uvloop 事件循环以降低调度开销"""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+async def create_task_async(client: httpx.AsyncClient, endpoint: str,
+                            payload: Dict[str, Any]) -> Optional[str]:
+    """create_task 的异步版本"""
+    try:
+        return _parse_create(await client.post(endpoint, content=orjson.dumps(payload)))
+    except Exception as e:
+        print(f"创建任务异常: {e}")
+        return None
+
+async def get_task_status_async(client: httpx.AsyncClient, task_id: str, endpoint: str = "/v1/scrape",
+                                long_poll: bool = False,
+                                max_wait: float = LONG_POLL_TIMEOUT + 5) -> Optional[Dict[str, Any]]:
+    """get_task_status 的异步版本"""
+    try:
+        response = await client.get(f"{endpoint}/{task_id}", **_status_options(long_poll, max_wait))
+        return _parse_status(response, long_poll)
+    except Exception as e:
+        print(f"获取任务状态异常: {e}")
+        return None
+
+async def wait_for_task_completion_async(client: httpx.AsyncClient, task_id: str, endpoint: str = "/v1/scrape",
+                                         timeout: int = 60, poll_interval: int = 2) -> Optional[Dict[str, Any]]:
+    """wait_for_task_completion 的异步版本"""
+    deadline = time.monotonic() + timeout
+    
+    while time.monotonic() < deadline:
+        request_started = time.monotonic()
+        status = await get_task_status_async(client, task_id, endpoint, long_poll=True,
+                                             max_wait=deadline - request_started)
+        if _is_finished(status):
+            return status
+        
+        await asyncio.sleep(_poll_delay(request_started, poll_interval, deadline))
+    
+    print(f"任务 {task_id} 超时未完成")
+    return None
@@ -10,19 +10,25 @@
 该模块包含对 crawlrs 系统核心功能的端到端测试，验证从任务创建到结果获取的完整业务流程。
 """
 
-import requests
-import time
+import asyncio
+import httpx
 import json
+import orjson
 import uuid
-from typing import Dict, Any, Optional, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Tuple
 
-# 基础配置
-BASE_URL = "http://localhost:8899"
-HEADERS = {
-    "Authorization": "Bearer test-api-key",
-    "Content-Type": "application/json"
-}
+from _client import (
+    HEADERS,
+    CLIENT,
+    CLIENT_OPTIONS,
+    create_task,
+    wait_for_task_completion,
+    wait_for_status,
+    cancel_task,
+    create_task_async,
+    wait_for_task_completion_async,
+    run_async,
+)
 
 # 测试数据
 TEST_URLS = {
@@ -32,65 +38,8 @@ TEST_URLS = {
     "error": "https://httpbin.org/status/500"
 }
 
-def create_task(endpoint: str, payload: Dict[str, Any]) -> Optional[str]:
-    """创建任务并返回任务ID"""
-    try:
-        response = requests.post(f"{BASE_URL}{endpoint}", json=payload, headers=HEADERS)
-        if response.status_code in [201, 202]:
-            result = response.json()
-            return result.get("id")
-        else:
-            print(f"创建任务失败: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"创建任务异常: {e}")
-        return None
-
-def get_task_status(task_id: str, endpoint: str = "/v1/scrape") -> Optional[Dict[str, Any]]:
-    """获取任务状态"""
-    try:
-        response = requests.get(f"{BASE_URL}{endpoint}/{task_id}", headers=HEADERS)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"获取任务状态失败: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"获取任务状态异常: {e}")
-        return None
-
-def wait_for_task_completion(task_id: str, endpoint: str = "/v1/scrape", 
-                           timeout: int = 60, poll_interval: int = 2) -> Optional[Dict[str, Any]]:
-    """等待任务完成并返回最终结果"""
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        status = get_task_status(task_id, endpoint)
-        if not status:
-            return None
-            
-        task_status = status.get("status", "").lower()
-        
-        if task_status == "completed":
-            return status
-        elif task_status == "failed":
-            return status
-        elif task_status in ["cancelled", "timeout"]:
-            return status
-        
-        time.sleep(poll_interval)
-    
-    print(f"任务 {task_id} 超时未完成")
-    return None
-
-def cancel_task(task_id: str, endpoint: str = "/v1/scrape") -> bool:
-    """取消任务"""
-    try:
-        response = requests.delete(f"{BASE_URL}{endpoint}/{task_id}", headers=HEADERS)
-        return response.status_code == 204
-    except Exception as e:
-        print(f"取消任务异常: {e}")
-        return False
+# 并发任务测试中同时在途的等待（轮询）协程上限，与任务数解耦
+MAX_IN_FLIGHT_WAITS = 3
 
 def test_scrape_basic():
     """测试基础抓取功能"""
@@ -292,18 +241,17 @@ def test_task_cancellation():
     
     print(f"✅ 创建任务成功: {task_id}")
     
-    # 等待一小段时间让任务开始
-    time.sleep(3)
+    # 等待任务开始运行（或已提前结束）
+    wait_for_status(task_id, "/v1/crawl", {"processing", "completed", "failed", "cancelled"})
     
     # 尝试取消任务
     if cancel_task(task_id, "/v1/crawl"):
         print("✅ 任务取消请求成功")
         
         # 等待并验证任务状态
-        time.sleep(2)
-        final_status = get_task_status(task_id, "/v1/crawl")
+        final_status = wait_for_status(task_id, "/v1/crawl", {"cancelled"})
         
-        if final_status and final_status.get("status") in ["cancelled", "cancelling"]:
+        if final_status and final_status.get("status") == "cancelled":
             print("✅ 任务已成功取消")
             return True
         else:
@@ -317,26 +265,27 @@ def test_concurrent_tasks():
     """测试并发任务处理"""
     print("🧪 测试并发任务处理...")
     
-    def create_and_wait_task(task_num: int) -> Dict[str, Any]:
-        """创建并等待单个任务完成"""
-        payload = {
-            "url": TEST_URLS["simple"],
-            "task_type": "scrape",
-            "payload": {
-                "extract_rules": {
-                    "title": {
-                        "selector": "title",
-                        "is_array": False
-                    }
+    payload = {
+        "url": TEST_URLS["simple"],
+        "task_type": "scrape",
+        "payload": {
+            "extract_rules": {
+                "title": {
+                    "selector": "title",
+                    "is_array": False
                 }
             }
         }
-        
-        task_id = create_task("/v1/scrape", payload)
+    }
+    
+    async def wait_task(client: httpx.AsyncClient, sem: asyncio.Semaphore,
+                        task_num: int, task_id: Optional[str]) -> Dict[str, Any]:
+        """等待单个已提交任务完成"""
         if not task_id:
             return {"success": False, "error": "创建任务失败"}
         
-        result = wait_for_task_completion(task_id)
+        async with sem:
+            result = await wait_for_task_completion_async(client, task_id)
         if not result:
             return {"success": False, "error": "任务未完成"}
         
@@ -346,18 +295,19 @@ def test_concurrent_tasks():
             "task_num": task_num
         }
     
+    async def run_tasks(num_tasks: int) -> List[Dict[str, Any]]:
+        # 先一次性提交全部任务，再并发等待；同时在途的等待数由 MAX_IN_FLIGHT_WAITS 限制，所有协程共享一个异步客户端
+        sem = asyncio.Semaphore(MAX_IN_FLIGHT_WAITS)
+        async with httpx.AsyncClient(**CLIENT_OPTIONS) as client:
+            task_ids = await asyncio.gather(*[create_task_async(client, "/v1/scrape", payload) for _ in range(num_tasks)])
+            return await asyncio.gather(*[wait_task(client, sem, i, task_id) for i, task_id in enumerate(task_ids)])
+    
     # 并发创建5个任务
     num_tasks = 5
-    results = []
-    
-    with ThreadPoolExecutor(max_workers=num_tasks) as executor:
-        futures = [executor.submit(create_and_wait_task, i) for i in range(num_tasks)]
-        
-        for future in as_completed(futures):
-            results.append(future.result())
+    results = run_async(run_tasks(num_tasks))
     
     # 验证结果
-    successful_tasks = sum(1 for r in results if r.get("success", False))
+    successful_tasks = sum(r.get("success", False) for r in results)
     
     print(f"✅ 并发任务测试结果: {successful_tasks}/{num_tasks} 成功")
     
@@ -411,9 +361,9 @@ def test_error_handling():
         print(f"  测试: {test_case['name']}")
         
         headers = test_case.get("headers", HEADERS)
-        response = requests.post(f"{BASE_URL}/v1/scrape", 
-                               json=test_case["payload"], 
-                               headers=headers)
+        response = CLIENT.post("/v1/scrape", 
+                             content=orjson.dumps(test_case["payload"]), 
+                             headers=headers)
         
         if response.status_code == test_case["expected_status"]:
             print(f"    ✅ 返回正确的状态码: {response.status_code}")
@@ -435,19 +385,39 @@ def test_rate_limiting():
     }
     
     # 发送超过速率限制的请求（假设限制为100 RPM）
-    rate_limited = False
-    
-    for i in range(105):
-        response = requests.post(f"{BASE_URL}/v1/scrape", json=payload, headers=HEADERS)
-        
-        if response.status_code == 429:  # Too Many Requests
-            rate_limited = True
-            print(f"✅ 在第 {i+1} 个请求时触发速率限制")
-            break
+    rate_limit = 100
+    
+    async def probe(client: httpx.AsyncClient, sem: asyncio.Semaphore) -> httpx.Response:
+        async with sem:
+            return await client.post("/v1/scrape", content=orjson.dumps(payload))
+    
+    async def burst(num_requests: int) -> Tuple[int, Optional[httpx.Response]]:
+        """并发发送请求，收到第一个 429 后取消其余请求；返回已完成的请求数与 429 响应"""
+        sem = asyncio.Semaphore(rate_limit)
+        async with httpx.AsyncClient(**CLIENT_OPTIONS) as client:
+            pending = {asyncio.create_task(probe(client, sem)) for _ in range(num_requests)}
+            completed = 0
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        completed += 1
+                        if task.exception() is None and task.result().status_code == 429:  # Too Many Requests
+                            return completed, task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        return completed, None
+    
+    completed, response = run_async(burst(rate_limit + 5))
+    rate_limited = response is not None
+    if rate_limited:
+        print(f"✅ 已完成 {completed} 个请求时收到速率限制响应")
     
     if rate_limited:
         # 验证错误响应格式
-        error_data = response.json()
+        error_data = orjson.loads(response.content)
         if "error" in error_data and "rate limit" in error_data["error"].lower():
             print("✅ 速率限制错误信息正确")
             return True
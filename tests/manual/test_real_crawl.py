@@ -4,10 +4,13 @@
 # Licensed under the MIT License
 # See LICENSE file in the project root for full license information.
 
-import requests
-import time
-import json
+import aiohttp
+import asyncio
+import ijson
+import orjson
+import random
 import sys
+import time
 
 BASE_URL = "http://localhost:8899/v1"
 API_KEY = "test_api_key_123"
@@ -21,81 +24,119 @@ URLS = [
     "https://www.chinanews.com.cn/sh/2025/12-14/10533307.shtml"
 ]
 
-def run_crawl(url):
+CRAWL_URL = f"{BASE_URL}/crawl"
+CRAWL_TIMEOUT = 30 # Seconds to wait for a crawl to finish
+
+# Shared by every crawl; only url/name differ per request
+CRAWL_CONFIG = {
+    "max_depth": 1, # Fetch the page and maybe one level deep, or just 0 if we want strictly one page. 
+                    # But wait, if max_depth is 0, process_crawl_result returns empty immediately.
+                    # The initial task has depth 0. 
+                    # If max_depth is 1, depth 0 < 1, so it extracts links and creates depth 1 tasks.
+                    # If max_depth is 0, depth 0 >= 0, so it returns empty.
+                    # So max_depth 0 means "only this page".
+    "strategy": "bfs",
+    "headers": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
+}
+
+STATUS_FIELDS = ("status", "completed_tasks", "failed_tasks", "total_tasks")
+SMALL_BODY_BYTES = 8 * 1024 # Bodies below this are cheaper to decode in one go
+SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+async def read_status_fields(response):
+    # Status bodies can carry large result arrays; walk parser events and keep
+    # only the top-level scalars we print, so nothing else becomes a Python object
+    if response.content_length is not None and response.content_length < SMALL_BODY_BYTES:
+        return orjson.loads(await response.read())
+
+    fields = {}
+    async for prefix, event, value in ijson.parse_async(response.content):
+        if prefix in STATUS_FIELDS and event in SCALAR_EVENTS:
+            fields[prefix] = value
+            if len(fields) == len(STATUS_FIELDS):
+                break
+
+    # Drain the unparsed rest without decoding it so aiohttp hands the
+    # connection back to the keep-alive pool instead of closing it
+    async for _ in response.content.iter_chunked(64 * 1024):
+        pass
+    return fields
+
+async def run_crawl(session, url):
     print(f"\n🚀 Starting crawl for: {url}")
     payload = {
         "url": url,
         "name": f"Test Crawl - {url[-20:]}",
-        "config": {
-            "max_depth": 1, # Fetch the page and maybe one level deep, or just 0 if we want strictly one page. 
-                            # But wait, if max_depth is 0, process_crawl_result returns empty immediately.
-                            # The initial task has depth 0. 
-                            # If max_depth is 1, depth 0 < 1, so it extracts links and creates depth 1 tasks.
-                            # If max_depth is 0, depth 0 >= 0, so it returns empty.
-                            # So max_depth 0 means "only this page".
-            "strategy": "bfs",
-            "headers": {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        }
+        "config": CRAWL_CONFIG
     }
 
     try:
         # Create Crawl
-        response = requests.post(f"{BASE_URL}/crawl", json=payload, headers=HEADERS)
-        if response.status_code != 201:
-            print(f"❌ Failed to create crawl: {response.status_code} - {response.text}")
-            return
+        async with session.post(CRAWL_URL, data=orjson.dumps(payload)) as response:
+            if response.status != 201:
+                print(f"❌ Failed to create crawl: {response.status} - {await response.text()}")
+                return
+            data = orjson.loads(await response.read())
 
-        data = response.json()
         crawl_id = data["id"]
         print(f"✅ Crawl created with ID: {crawl_id}")
 
         # Poll Status
-        print("⏳ Waiting for crawl to complete...")
-        for i in range(30): # Wait up to 30 seconds
-            status_res = requests.get(f"{BASE_URL}/crawl/{crawl_id}", headers=HEADERS)
-            if status_res.status_code != 200:
-                print(f"⚠️ Failed to get status: {status_res.status_code}")
-                time.sleep(1)
-                continue
-            
-            crawl_data = status_res.json()
-            status = crawl_data["status"]
-            completed = crawl_data["completed_tasks"]
-            failed = crawl_data["failed_tasks"]
-            total = crawl_data["total_tasks"]
-
-            print(f"   [{i+1}s] Status: {status}, Completed: {completed}, Failed: {failed}, Total: {total}")
-
-            if status in ["completed", "failed", "cancelled"]:
-                if completed > 0:
-                    print(f"✅ Crawl finished successfully! Completed tasks: {completed}")
-                else:
-                    print(f"❌ Crawl finished but no tasks completed. Status: {status}")
-                break
-            
-            time.sleep(1)
+        print(f"⏳ Waiting for crawl {crawl_id} to complete...")
+        status_url = f"{CRAWL_URL}/{crawl_id}"
+        start = time.monotonic()
+        deadline = start + CRAWL_TIMEOUT
+        attempt = 0
+        while time.monotonic() < deadline:
+            async with session.get(status_url) as status_res:
+                status_code = status_res.status
+                crawl_data = await read_status_fields(status_res) if status_code == 200 else None
+
+            if crawl_data is None:
+                print(f"⚠️ [{crawl_id}] Failed to get status: {status_code}")
+            else:
+                status = crawl_data["status"]
+                completed = crawl_data["completed_tasks"]
+                failed = crawl_data["failed_tasks"]
+                total = crawl_data["total_tasks"]
+
+                print(f"   [{crawl_id}] [{time.monotonic() - start:.1f}s] Status: {status}, Completed: {completed}, Failed: {failed}, Total: {total}")
+
+                if status in ["completed", "failed", "cancelled"]:
+                    if completed > 0:
+                        print(f"✅ [{crawl_id}] Crawl finished successfully! Completed tasks: {completed}")
+                    else:
+                        print(f"❌ [{crawl_id}] Crawl finished but no tasks completed. Status: {status}")
+                    break
+
+            # Exponential backoff with jitter so concurrent crawls don't poll in lockstep
+            await asyncio.sleep(min(5.0, 0.2 * (1.6 ** attempt)) + random.random() * 0.1)
+            attempt += 1
         else:
-            print("❌ Timeout waiting for crawl to complete")
+            print(f"❌ [{crawl_id}] Timeout waiting for crawl to complete")
 
     except Exception as e:
         print(f"❌ Exception: {e}")
 
+async def main():
+    connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=60)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        # Verify Health First
+        try:
+            async with session.get("http://localhost:8899/health") as h:
+                if h.status != 200:
+                    print("❌ Health check failed. Is the server running?")
+                    sys.exit(1)
+            print("✅ Server is healthy")
+        except aiohttp.ClientError:
+            print("❌ Could not connect to server")
+            sys.exit(1)
+
+        # All crawls share one event loop and one connection pool
+        await asyncio.gather(*(run_crawl(session, url) for url in URLS))
+
 if __name__ == "__main__":
     print("🌍 Starting Real-World Crawl Test")
-    
-    # Verify Health First
-    try:
-        h = requests.get("http://localhost:8899/health")
-        if h.status_code != 200:
-            print("❌ Health check failed. Is the server running?")
-            sys.exit(1)
-        print("✅ Server is healthy")
-    except:
-        print("❌ Could not connect to server")
-        sys.exit(1)
-
-    for url in URLS:
-        run_crawl(url)
-        time.sleep(2) # Graceful pause between tests
+    asyncio.run(main())